@@ -0,0 +1,217 @@
+#This file is an asyncio version of comfy_client.py. Images are downloaded while the workflow is still running, and written to disk as they arrive
+
+
+import aiohttp
+import aiofiles
+import asyncio
+import uuid
+import orjson
+import os
+import argparse
+
+from comfy_client import PNG_SIGNATURE, load_workflow, to_png
+
+
+class AsyncComfyWebAPI:
+    def __init__(self, server_address: str, max_connections=16):
+        self.server_address = server_address
+        self.client_id = str(uuid.uuid4())
+        self.max_connections = max_connections
+        self.session = None
+
+    async def __aenter__(self):
+        # One pooled session for every request; connections are kept alive between downloads
+        connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=300)
+        self.session = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+        self.session = None
+
+    async def queue_prompt(self, workflow: dict):
+        """
+        Queue a prompt on the ComfyUI server, and return the response
+
+        :param workflow: The workflow dictionary
+        :return: A dictionary containing the prompt id
+        """
+        p = {"prompt": workflow, "client_id": self.client_id}
+        data = orjson.dumps(p, option=orjson.OPT_NON_STR_KEYS) # allow int node ids, like json.dumps did
+        async with self.session.post("http://{}/prompt".format(self.server_address), data=data) as response:
+            response.raise_for_status()
+            return orjson.loads(await response.read())
+
+    async def get_image(self, filename: str, subfolder: str, folder_type: str):
+        """
+        Get a single image from the ComfyUI server
+
+        :param filename: The filename of the image
+        :param subfolder: The subfolder in which the image is stored
+        :param folder_type: The type of folder in which the image is stored (e.g. "input", "output")
+        :return: The image data in bytes
+        """
+        data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
+        async with self.session.get("http://{}/view".format(self.server_address), params=data) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def get_history(self, prompt_id: str):
+        """
+        Retrieve the history of a specific prompt from the ComfyUI server.
+
+        :param prompt_id: The unique identifier of the prompt whose history is to be retrieved.
+        :return: A dictionary containing the history data of the specified prompt.
+        """
+        async with self.session.get("http://{}/history/{}".format(self.server_address, prompt_id)) as response:
+            response.raise_for_status()
+            return orjson.loads(await response.read())
+
+    async def _download(self, node_images: list, i: int, index: int, image: dict, on_image):
+        """
+        Download one image into its slot of a node's image list, then hand it to on_image.
+        """
+        image_data = await self.get_image(image['filename'], image['subfolder'], image['type'])
+        node_images[i] = image_data
+        if on_image is not None:
+            await on_image(index, image_data)
+
+    async def get_images(self, ws: aiohttp.ClientWebSocketResponse, workflow: dict, fetch_history=True, on_image=None):
+        """
+        Get the images generated by the ComfyUI server after executing a prompt
+
+        A download is started as soon as the server reports a node as executed, so images are
+        fetched while the rest of the workflow is still running.
+
+        :param ws: An established websocket connection to the ComfyUI server
+        :param workflow: The workflow dictionary
+        :param fetch_history: Whether to check the prompt history for output nodes that weren't reported
+            while running (e.g. cached nodes). If False, the history is only requested when nothing was
+            received at all. Defaults to True
+        :param on_image: Optional coroutine function called as on_image(index, image_data) for every image,
+            where index numbers the images in the order they were found
+        :return: A dictionary with node ids as keys and lists of image data as values. The image data is bytes-like:
+            images streamed over the websocket are memoryviews, downloaded images are bytes
+        """
+        prompt_id = (await self.queue_prompt(workflow))['prompt_id']
+        output_images = {}
+        tasks = []
+        index = 0
+        current_node = ""
+        ws_images = []
+        pid = '"' + prompt_id + '"'
+
+        def start_downloads(node_id, images):
+            nonlocal index
+            node_images = output_images[node_id] = [None] * len(images)
+            for i, image in enumerate(images):
+                tasks.append(asyncio.create_task(self._download(node_images, i, index, image, on_image)))
+                index += 1
+
+        try:
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.BINARY:
+                    if current_node == 'save_image_websocket_node':
+                        # skip the 8 byte event header without copying the image payload
+                        image_data = memoryview(msg.data)[8:]
+                        if not ws_images:
+                            output_images[current_node] = ws_images # only add the node once something was streamed
+                        ws_images.append(image_data)
+                        if on_image is not None:
+                            tasks.append(asyncio.create_task(on_image(index, image_data)))
+                        index += 1
+                elif msg.type == aiohttp.WSMsgType.TEXT:
+                    # Only 'executing' and 'executed' messages for our prompt matter here, skip the rest without parsing them
+                    out = msg.data
+                    if pid not in out or ('"executing"' not in out and '"executed"' not in out):
+                        continue
+                    message = orjson.loads(out)
+                    msg_type = message.get('type')
+                    data = message['data']
+                    if data.get('prompt_id') != prompt_id:
+                        continue # the id matched somewhere else in the frame
+
+                    if msg_type == 'executing':
+                        if data['node'] is None:
+                            break #Execution is done
+                        current_node = data['node']
+                    elif msg_type == 'executed':
+                        images = (data.get('output') or {}).get('images')
+                        if images and not output_images.get(data['node']):
+                            start_downloads(data['node'], images)
+                else:
+                    break # the connection was closed or errored
+
+            if fetch_history or not (tasks or ws_images):
+                # pick up output nodes the server didn't report while running
+                history = (await self.get_history(prompt_id))[prompt_id]
+                for node_id in history['outputs']:
+                    if node_id in output_images:
+                        continue
+                    start_downloads(node_id, history['outputs'][node_id].get('images', []))
+
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Don't leave downloads running against a session that is about to be closed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return output_images
+
+    async def get_workflow_output(self, workflow_path: str, fetch_history=True, on_image=None):
+        """
+        Retrieve the output images generated by the ComfyUI server for a given workflow.
+
+        :param workflow_path: The path to the JSON file containing the workflow
+        :param fetch_history: Whether to check the prompt history for unreported outputs, see get_images. Defaults to True
+        :param on_image: Optional coroutine function called for every image, see get_images
+        :return: A dictionary with node IDs as keys and lists of bytes-like image data as values, see get_images
+        """
+        prompt = load_workflow(workflow_path)
+
+        # max_msg_size=0 lifts aiohttp's 4MB frame limit, images streamed over the websocket can be bigger
+        async with self.session.ws_connect(f"ws://{self.server_address}/ws?clientId={self.client_id}", max_msg_size=0) as ws:
+            return await self.get_images(ws, prompt, fetch_history=fetch_history, on_image=on_image)
+
+    async def download_images(self, workflow_path: str, output_dir="images", filename_prefix="output", fetch_history=True):
+        """
+        Downloads images from the ComfyUI server for a given workflow, writing each image to disk as soon as it arrives.
+
+        :param workflow_path: The path to the workflow file
+        :param output_dir: The directory where images will be saved. Defaults to "images"
+        :param filename_prefix: The prefix for the filenames of saved images. Defaults to "output"
+        :param fetch_history: Whether to check the prompt history for unreported outputs, see get_images. Defaults to True
+        :return: None
+        """
+        if not os.path.exists(output_dir):
+            print(f"Creating output directory: {output_dir}")
+            os.mkdir(output_dir)
+
+        prefix = os.path.join(output_dir, f"{filename_prefix}_")
+
+        async def save_image(index, image_data):
+            if image_data[:8] != PNG_SIGNATURE:
+                # Converting to PNG is CPU bound, keep it off the event loop
+                image_data = await asyncio.to_thread(to_png, image_data)
+            async with aiofiles.open(prefix + str(index) + ".png", 'wb') as f:
+                await f.write(image_data)
+
+        await self.get_workflow_output(workflow_path, fetch_history=fetch_history, on_image=save_image)
+
+
+async def main(args):
+    async with AsyncComfyWebAPI(args.server_address) as api:
+        await api.download_images(workflow_path=args.workflow_path, output_dir=args.media_path, filename_prefix=args.filename_prefix, fetch_history=not args.skip_history)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--server_address', type=str, default="127.0.0.1:8188", help="Address of the ComfyUI server. Defaults to 127.0.0.1:8188")
+    parser.add_argument('--media_path', type=str, default=".", help="Path to where images will be downloaded to. Defaults to current directory.")
+    parser.add_argument('--workflow_path', type=str, default="workflow_api/image_workflow_api.json", help="Path to the workflow api file. Needs to be in API format.")
+    parser.add_argument('--filename_prefix', type=str, default="output", help="Prefix for the filenames of the saved images. Defaults to 'output'.")
+    parser.add_argument('--skip_history', action='store_true', help="Skip checking the prompt history for outputs that weren't reported while running, unless nothing was received.")
+
+    asyncio.run(main(parser.parse_args()))
@@ -3,22 +3,70 @@
 
 import websocket #NOTE: websocket-client (https://github.com/websocket-client/websocket-client)
 import uuid
-import json
-import urllib.request
-import urllib.parse
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import io
 import cv2
 import numpy as np
 import os
+import mmap
 import shutil as sh
+import subprocess
+import queue
+import errno
+import tempfile
 import argparse
 
 
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# yuv420p (and so libx264/h264_nvenc) needs even frame sizes, pad odd widths/heights by one pixel
+EVEN_SIZE_FILTER = "pad=ceil(iw/2)*2:ceil(ih/2)*2"
+# Writing to the stdin of an ffmpeg that has exited fails with EPIPE, or EINVAL on Windows
+PIPE_CLOSED_ERRNOS = (errno.EPIPE, errno.EINVAL)
+
+
+def load_workflow(workflow_path: str):
+    """
+    Read a workflow in API format from a JSON file.
+
+    :param workflow_path: The path to the JSON file containing the workflow
+    :return: The workflow dictionary
+    """
+    # Parse straight from a read-only memory map of the file, so the workflow is
+    # never copied into an intermediate bytes/str object before parsing
+    with open(workflow_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return orjson.loads(f.read())  # mmap can't map an empty file, let orjson raise
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as workflow:
+            return orjson.loads(workflow)
+
+
+def to_png(image_data):
+    """
+    Re-encode image data in any format PIL can read as PNG bytes.
+
+    :param image_data: The encoded image data
+    :return: The image as PNG bytes
+    """
+    buffer = io.BytesIO()
+    Image.open(io.BytesIO(image_data)).save(buffer, format="PNG", optimize=False, compress_level=1)
+    return buffer.getvalue()
+
+
 class ComfyWebAPI:  
-    def __init__(self, server_address: str):
+    def __init__(self, server_address: str, max_workers=8):
         self.server_address = server_address
+        self.max_workers = max_workers
         self.client_id = str(uuid.uuid4())
+        # A single session keeps connections to the server alive between requests,
+        # so downloading many images doesn't pay for a new TCP handshake each time
+        self.session = requests.Session()
+        self.session.headers.update({"Connection": "keep-alive"})
+        # Size the pool so every download thread can hold its own kept-alive connection
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=max_workers))
 
     def queue_prompt(self, workflow: dict):
         """
@@ -28,9 +76,11 @@ class ComfyWebAPI:
         :return: A dictionary containing the prompt id
         """
         p = {"prompt": workflow, "client_id": self.client_id}
-        data = json.dumps(p).encode('utf-8')
-        req =  urllib.request.Request("http://{}/prompt".format(self.server_address), data=data)
-        return json.loads(urllib.request.urlopen(req).read())
+        # OPT_NON_STR_KEYS turns int node ids into strings, like json.dumps did
+        data = orjson.dumps(p, option=orjson.OPT_NON_STR_KEYS)
+        response = self.session.post("http://{}/prompt".format(self.server_address), data=data)
+        response.raise_for_status()
+        return orjson.loads(response.content)
 
     def get_image(self, filename: str, subfolder: str, folder_type: str):
         """
@@ -42,9 +92,9 @@ class ComfyWebAPI:
         :return: The image data in bytes
         """
         data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-        url_values = urllib.parse.urlencode(data)
-        with urllib.request.urlopen("http://{}/view?{}".format(self.server_address, url_values)) as response:
-            return response.read()
+        response = self.session.get("http://{}/view".format(self.server_address), params=data)
+        response.raise_for_status()
+        return response.content
 
     def get_history(self, prompt_id: str):
         """
@@ -54,50 +104,88 @@ class ComfyWebAPI:
         :return: A dictionary containing the history data of the specified prompt.
         """
 
-        with urllib.request.urlopen("http://{}/history/{}".format(self.server_address, prompt_id)) as response:
-            return json.loads(response.read())
+        response = self.session.get("http://{}/history/{}".format(self.server_address, prompt_id))
+        response.raise_for_status()
+        return orjson.loads(response.content)
 
-    def get_images(self, ws: websocket.WebSocket, workflow:dict):
+    def get_images(self, ws: websocket.WebSocket, workflow:dict, fetch_history=True, on_image=None):
 
         """
         Get the images generated by the ComfyUI server after executing a prompt
         
         :param ws: An established websocket connection to the ComfyUI server
         :param workflow: The workflow dictionary
-        :return: A dictionary with node ids as keys and lists of image data as values
+        :param fetch_history: Whether to download the images of the other output nodes listed in the prompt history.
+            If False, the history is only requested when nothing was streamed over the websocket. Defaults to True
+        :param on_image: Optional callable, on_image(index, image_data), called for every image as soon as it has been
+            received, where index numbers the images in output order. Downloaded images are reported from the
+            download threads and may arrive out of order
+        :return: A dictionary with node ids as keys and lists of image data as values. The image data is bytes-like:
+            images streamed over the websocket are memoryviews, downloaded images are bytes
         """
         prompt_id = self.queue_prompt(workflow)['prompt_id']
         output_images = {}
         current_node = ""
+        ws_images = []
+        pid = b'"' + prompt_id.encode() + b'"'
 
         while True:
-            out = ws.recv()
-            if isinstance(out, str):
-                message = json.loads(out)
-
-                if message['type'] == 'executing':
-                    data = message['data']
-                    if data['prompt_id'] == prompt_id:
-                        if data['node'] is None:
-                            break #Execution is done
-                        else:
-                            current_node = data['node']
-            else:
+            # recv_data hands back the raw opcode and payload bytes, so frames don't need
+            # to be decoded to str first and binary frames aren't type checked
+            opcode, out = ws.recv_data()
+            if opcode == websocket.ABNF.OPCODE_BINARY:
                 if current_node == 'save_image_websocket_node':
-                    images_output = output_images.get(current_node, [])
-                    images_output.append(out[8:])
-                    output_images[current_node] = images_output
+                    # skip the 8 byte event header without copying the image payload
+                    image_data = memoryview(out)[8:]
+                    if not ws_images:
+                        output_images[current_node] = ws_images # only add the node once something was streamed
+                    if on_image is not None:
+                        on_image(len(ws_images), image_data)
+                    ws_images.append(image_data)
+            elif b'"executing"' in out and pid in out:
+                # Only 'executing' messages for our prompt matter here, so progress/status frames
+                # and messages for other prompts are skipped without parsing them
+                message = orjson.loads(out)
+                if message.get('type') != 'executing':
+                    continue
+                data = message['data']
+                if data.get('prompt_id') != prompt_id:
+                    continue # the id matched somewhere else in the frame
+
+                node = data['node']
+                if node is None:
+                    break #Execution is done
+                current_node = node
+
+        if not fetch_history and ws_images:
+            return output_images # everything we need came over the websocket
 
         # we're grabbing the images from the history
         history = self.get_history(prompt_id)[prompt_id]
+        tasks = []
         for node_id in history['outputs']:
+            if output_images.get(node_id):
+                continue # already streamed over the websocket, don't download it again
             node_output = history['outputs'][node_id]
-            images_output = []
-            if 'images' in node_output:
-                for image in node_output['images']:
-                    image_data = self.get_image(image['filename'], image['subfolder'], image['type'])
-                    images_output.append(image_data)
-            output_images[node_id] = images_output
+            node_images = node_output.get('images', [])
+            output_images[node_id] = [None] * len(node_images)
+            for i, image in enumerate(node_images):
+                index = len(ws_images) + len(tasks)
+                tasks.append((node_id, i, index, image['filename'], image['subfolder'], image['type']))
+
+        _get = self.get_image
+        def download(task):
+            image_data = _get(*task[3:])
+            if on_image is not None:
+                on_image(task[2], image_data)
+            return image_data
+
+        # The downloads are independent of each other, so fetch them concurrently.
+        # executor.map keeps the results in the same order as the tasks
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(download, tasks)
+            for (node_id, i, *_), image_data in zip(tasks, results):
+                output_images[node_id][i] = image_data
 
         return output_images
             
@@ -116,86 +204,252 @@ class ComfyWebAPI:
         """
 
         i = 0 
+        prefix = os.path.join(image_folder, f"{filename_prefix}_")
         for node_id in images:
             for image_data in images[node_id]:
-                image = Image.open(io.BytesIO(image_data))
-                image.save(f"{image_folder}/{filename_prefix}_{i}.png")
+                path = prefix + str(i) + ".png"
+                if image_data[:8] == PNG_SIGNATURE:
+                    # The server already sent a PNG, write it as is instead of decoding and re-encoding it
+                    with open(path, 'wb') as f:
+                        f.write(image_data)
+                else:
+                    # Converting to PNG, use the fastest zlib setting since this runs once per image
+                    image = Image.open(io.BytesIO(image_data))
+                    image.save(path, optimize=False, compress_level=1)
                 i+=1
 
 
-    def create_video_from_images(self, image_folder: str, video_path="output.mp4", frame_rate=24):
+    def _start_ffmpeg(self, video_path: str, frame_rate=24, codec="libx264"):
+        """
+        Start an ffmpeg process that encodes PNG images written to its stdin into a video.
+
+        :param video_path: The path to the video file to be written
+        :param frame_rate: The frame rate of the video. Defaults to 24
+        :param codec: The ffmpeg video encoder to use, e.g. "h264_nvenc" on NVIDIA GPUs. Defaults to "libx264"
+        :return: The running ffmpeg process
+        """
+        cmd = ["ffmpeg", "-y", "-loglevel", "error",
+               "-f", "image2pipe", "-framerate", str(frame_rate), "-c:v", "png", "-i", "-",
+               "-vf", EVEN_SIZE_FILTER, "-c:v", codec, "-pix_fmt", "yuv420p", video_path]
+        return subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def _finish_ffmpeg(self, proc: subprocess.Popen):
+        """
+        Close the stdin of an ffmpeg process started by _start_ffmpeg and wait for the video to be written.
+
+        :param proc: The running ffmpeg process
+        """
+        try:
+            proc.stdin.close()
+        except OSError as e:
+            if e.errno not in PIPE_CLOSED_ERRNOS:
+                raise
+            # ffmpeg already exited, its return code says why
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+    def create_video_from_images(self, image_folder: str, video_path="output.mp4", frame_rate=24, codec="libx264"):
         
         """
         Create a video from the images in the specified folder.
 
-        This function iterates over a directory of images, reads them, and writes them to a video file.
-        The video filename is specified by the video_path parameter, and the frame rate is specified by the frame_rate parameter.
+        This function lists the images in a directory in frame order, and hands ffmpeg a concat manifest
+        of them, so ffmpeg reads each file directly and writes them to a video file. The video filename
+        is specified by the video_path parameter, and the frame rate is specified by the frame_rate parameter.
+        If ffmpeg isn't installed, the images are decoded and written with OpenCV instead.
 
         :param image_folder: The directory containing images to be converted to video
         :param video_path: The path to the video file to be written. Defaults to "output.mp4"
         :param frame_rate: The frame rate of the video. Defaults to 24
+        :param codec: The ffmpeg video encoder to use. Defaults to "libx264"
+        """
+        # (index, path) pairs sort by frame index, and scandir already gives us the full path
+        entries = [(int(e.name.rsplit('_', 1)[-1].split('.', 1)[0]), os.path.abspath(e.path))
+                   for e in os.scandir(image_folder) if e.name.endswith(".png")]
+        entries.sort()
+        if not entries:
+            raise FileNotFoundError(f"No .png images found in {image_folder}")
+
+        if sh.which("ffmpeg") is None:
+            print("ffmpeg not found, falling back to OpenCV to write the video")
+            first_image = cv2.imread(entries[0][1])
+            height, width, _ = first_image.shape
+            video = self._open_cv2_writer(video_path, frame_rate, (width, height))
+            for _, path in entries:
+                video.write(cv2.imread(path))
+            video.release()
+            return
+
+        # The concat demuxer reads the files in the listed order, so gaps in the numbering don't matter.
+        # -frames:v keeps the output at exactly one frame per image
+        duration = f"duration {1 / frame_rate}\n"
+        lines = []
+        for _, path in entries:
+            lines.append("file '" + path.replace("'", "'\\''") + "'\n")
+            lines.append(duration)
+
+        manifest = tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt", delete=False)
+        try:
+            with manifest:
+                manifest.writelines(lines)
+            subprocess.run(["ffmpeg", "-y", "-loglevel", "error",
+                            "-f", "concat", "-safe", "0", "-i", manifest.name,
+                            "-vf", EVEN_SIZE_FILTER, "-c:v", codec, "-pix_fmt", "yuv420p", "-r", str(frame_rate),
+                            "-frames:v", str(len(entries)), video_path], check=True)
+        finally:
+            os.remove(manifest.name)
+
+    def _open_cv2_writer(self, video_path: str, frame_rate: int, size: tuple):
         """
-        images = [img for img in os.listdir(image_folder) if img.endswith(".png")]
-        images.sort(key=lambda x: int(x.split('.')[0].split('_')[-1]))
+        Open an OpenCV video writer, preferring NVIDIA's hardware H.264 encoder through GStreamer.
+        Falls back to the software 'mp4v' encoder when OpenCV wasn't built with GStreamer or nvh264enc is missing.
 
-        # Read the first image to get the size
-        first_image = cv2.imread(os.path.join(image_folder, images[0]))
-        height, width, _ = first_image.shape
+        :param video_path: The path to the video file to be written
+        :param frame_rate: The frame rate of the video
+        :param size: The (width, height) of the frames
+        :return: An opened cv2.VideoWriter
+        """
+        # Quote the path so spaces or '!' in it can't break up the pipeline description
+        location = '"' + video_path.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        pipeline = f"appsrc ! videoconvert ! nvh264enc ! h264parse ! mp4mux ! filesink location={location}"
+        video = cv2.VideoWriter(pipeline, cv2.CAP_GSTREAMER, 0, frame_rate, size)
+        if video.isOpened():
+            return video
 
-        # Initialize video writer
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Use 'mp4v' for MP4 format
-        video = cv2.VideoWriter(video_path, fourcc, frame_rate, (width, height))
+        return cv2.VideoWriter(video_path, fourcc, frame_rate, size)
+
+    def _feed_ffmpeg(self, frames: queue.Queue, proc: subprocess.Popen):
+        """
+        Write (index, png_data) frames from a queue into ffmpeg's stdin in index order, until None is received.
 
-        # Add images to the video
-        for image in images:
-            img_path = os.path.join(image_folder, image)
-            frame = cv2.imread(img_path)
-            video.write(frame)
+        Frames can arrive out of order, so they are held back until every earlier frame has been written.
+        The queue is always drained until None, even if ffmpeg stops accepting input or writing fails, so
+        producers never block. A closed pipe is reported by _finish_ffmpeg, other errors are raised once the
+        queue is drained.
 
-        # Release the video writer
+        :param frames: The queue the frames are put on
+        :param proc: The ffmpeg process started by _start_ffmpeg
+        """
+        pending = {}
+        next_index = 0
+        broken = False
+        done = False
+        try:
+            while True:
+                frame = frames.get()
+                if frame is None:
+                    done = True
+                    break
+                if broken:
+                    continue
+                pending[frame[0]] = frame[1]
+                while next_index in pending:
+                    image_data = pending.pop(next_index)
+                    next_index += 1
+                    try:
+                        proc.stdin.write(image_data)
+                    except OSError as e:
+                        if e.errno not in PIPE_CLOSED_ERRNOS:
+                            raise
+                        broken = True
+                        pending.clear()
+                        break
+        finally:
+            while not done:
+                done = frames.get() is None
+
+    def _write_video_cv2(self, images: dict, video_path: str, frame_rate=24):
+        """
+        Decode images and write them to a video with OpenCV. Used when ffmpeg isn't installed.
+
+        :param images: A dictionary with node IDs as keys and lists of image data as values
+        :param video_path: The path to the video file to be written
+        :param frame_rate: The frame rate of the video. Defaults to 24
+        """
+        video = None
+
+        for node_id in images:
+            for image_data in images[node_id]:
+                image = Image.open(io.BytesIO(image_data))
+                size = (image.width, image.height)
+
+                if video is None:
+                    video = self._open_cv2_writer(video_path, frame_rate, size)
+
+                image = cv2.cvtColor(np.array(image.convert("RGB")), cv2.COLOR_RGB2BGR)
+                video.write(image)
+        
         video.release()
-        cv2.destroyAllWindows()
 
-    def download_video(self, workflow_path:str, frame_rate=24, output_dir="./videos", filename_prefix="output2"):
+    def download_video(self, workflow_path:str, frame_rate=24, output_dir="./videos", filename_prefix="output2", codec="libx264", fetch_history=True):
 
         """
         Downloads and compiles a video from images generated by the ComfyUI server for a given workflow.
 
         This function retrieves images based on the specified workflow, creates a video from them,
         and saves it to the specified output directory with a given filename prefix. The video is
-        created at the specified frame rate.
+        created at the specified frame rate. The frames are piped from memory straight into ffmpeg
+        while the rest are still downloading, they never touch the disk. If ffmpeg isn't installed, OpenCV is used to write the video instead.
 
         :param workflow_path: The path to the JSON file containing the workflow.
         :param frame_rate: The frame rate of the resulting video. Defaults to 24.
         :param output_dir: The directory where the video will be saved. Defaults to "./videos".
         :param filename_prefix: The prefix for the video filename. Defaults to "output2".
+        :param codec: The ffmpeg video encoder to use. Defaults to "libx264".
+        :param fetch_history: Whether to download outputs listed in the prompt history, see get_images. Defaults to True.
         :return: None
         """
 
-        images = self.get_workflow_output(workflow_path=workflow_path)
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Use 'mp4v' for MP4 format
-        video = None
         video_path = f"{output_dir}/{filename_prefix}.mp4"
 
         if os.path.exists(output_dir) == False:
             print(f"Creating output directory: {output_dir}")
             os.mkdir(output_dir)
 
-        for node_id in images:
-            for image_data in images[node_id]:
-                image = Image.open(io.BytesIO(image_data))
-                size = (image.width, image.height)
-
-                if video is None:
-                    video = cv2.VideoWriter(video_path, fourcc, frame_rate, size)
-
-                image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-                video.write(image)
-        
-        video.release()
+        if sh.which("ffmpeg") is None:
+            print("ffmpeg not found, falling back to OpenCV to write the video")
+            images = self.get_workflow_output(workflow_path=workflow_path, fetch_history=fetch_history)
+            self._write_video_cv2(images, video_path, frame_rate)
+            return
+
+        prompt = load_workflow(workflow_path) # fail before starting ffmpeg if the workflow can't be read
+
+        # Frames are handed to a feeder thread as they arrive, so ffmpeg encodes the first
+        # frames while the rest are still downloading
+        frames = queue.Queue(maxsize=8)
+        proc = self._start_ffmpeg(video_path, frame_rate, codec)
+        feeder_pool = ThreadPoolExecutor(max_workers=1)
+        feeder = feeder_pool.submit(self._feed_ffmpeg, frames, proc)
+
+        def queue_frame(index, image_data):
+            if image_data[:8] != PNG_SIGNATURE:
+                image_data = to_png(image_data) # ffmpeg is reading a PNG stream
+            frames.put((index, image_data))
+
+        try:
+            self.get_prompt_output(prompt, fetch_history=fetch_history, on_image=queue_frame)
+            frames.put(None)
+            feeder_pool.shutdown()
+            feeder.result() # re-raise anything that went wrong in the feeder
+            self._finish_ffmpeg(proc)
+        except BaseException:
+            # Kill ffmpeg rather than letting it finalize a truncated video, and so its exit code
+            # can't replace the real error
+            proc.kill()
+            frames.put(None) # the feeder keeps draining, so this can't block
+            feeder_pool.shutdown()
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            proc.wait()
+            if os.path.exists(video_path):
+                os.remove(video_path)
+            raise
 
     
-    def get_workflow_output(self, workflow_path:str):
+    def get_workflow_output(self, workflow_path:str, fetch_history=True, on_image=None):
         """
         Retrieve the output images generated by the ComfyUI server for a given workflow.
 
@@ -204,30 +458,47 @@ class ComfyWebAPI:
         the generated images.
 
         :param workflow: The path to the JSON file containing the workflow
-        :return: A dictionary with node IDs as keys and lists of image data as values
+        :param fetch_history: Whether to download outputs listed in the prompt history, see get_images. Defaults to True
+        :param on_image: Optional callable called for every image as it is received, see get_images
+        :return: A dictionary with node IDs as keys and lists of bytes-like image data as values, see get_images
         """
 
-        workflow = open(workflow_path).read()
-        prompt = json.loads(workflow)
+        prompt = load_workflow(workflow_path)
+        return self.get_prompt_output(prompt, fetch_history=fetch_history, on_image=on_image)
 
+    def get_prompt_output(self, prompt: dict, fetch_history=True, on_image=None):
+        """
+        Retrieve the output images generated by the ComfyUI server for a workflow that is already loaded.
+
+        :param prompt: The workflow dictionary
+        :param fetch_history: Whether to download outputs listed in the prompt history, see get_images. Defaults to True
+        :param on_image: Optional callable called for every image as it is received, see get_images
+        :return: A dictionary with node IDs as keys and lists of bytes-like image data as values, see get_images
+        """
+        # ComfyUI only accepts prompts over HTTP, so the websocket is connected first and the
+        # prompt is POSTed on the already pooled HTTP session; connecting first also means no
+        # progress messages for the prompt can be missed
         ws = websocket.WebSocket()
         ws.connect(f"ws://{self.server_address}/ws?clientId={self.client_id}")
-        image_data = self.get_images(ws, prompt)
-        ws.close()
+        try:
+            image_data = self.get_images(ws, prompt, fetch_history=fetch_history, on_image=on_image)
+        finally:
+            ws.close()
 
         return image_data
 
 
-    def download_images(self, workflow_path:str, output_dir="images", filename_prefix="output"):
+    def download_images(self, workflow_path:str, output_dir="images", filename_prefix="output", fetch_history=True):
         """
         Downloads images from the ComfyUI server for a given workflow.
 
         :param workflow_path: The path to the workflow file
         :param output_dir: The directory where images will be saved. Defaults to "images"
         :param filename_prefix: The prefix for the filenames of saved images. Defaults to "output"
+        :param fetch_history: Whether to download outputs listed in the prompt history, see get_images. Defaults to True
         :return: None
         """
-        image_data = self.get_workflow_output(workflow_path=workflow_path)
+        image_data = self.get_workflow_output(workflow_path=workflow_path, fetch_history=fetch_history)
 
         if not os.path.exists(output_dir):
             print(f"Creating output directory: {output_dir}")
@@ -245,12 +516,13 @@ if __name__ == "__main__":
     parser.add_argument('--workflow_path', type=str, default="workflows/video_workflow_api.json", help="Path to the workflow api file. Needs to be in API format.")
     parser.add_argument('--frame_rate', type=int, default=24, help="Frame rate of the video. Defaults to 24.")
     parser.add_argument('--filename_prefix', type=str, default="output", help="Prefix for the filenames of the saved images. Defaults to 'output'.")
+    parser.add_argument('--skip_history', action='store_true', help="Only keep the images streamed over the websocket and skip the history request, unless nothing was streamed.")
 
     args = parser.parse_args()
     ComfyWebAPI = ComfyWebAPI(args.server_address)
 
     if args.type == "IMAGE":
-        ComfyWebAPI.download_images(workflow_path=args.workflow_path, output_dir=args.media_path, filename_prefix=args.filename_prefix)
+        ComfyWebAPI.download_images(workflow_path=args.workflow_path, output_dir=args.media_path, filename_prefix=args.filename_prefix, fetch_history=not args.skip_history)
     elif args.type == "VIDEO":
-       ComfyWebAPI.download_video(workflow_path=args.workflow_path, frame_rate=args.frame_rate, output_dir=args.media_path, filename_prefix=args.filename_prefix)
+       ComfyWebAPI.download_video(workflow_path=args.workflow_path, frame_rate=args.frame_rate, output_dir=args.media_path, filename_prefix=args.filename_prefix, fetch_history=not args.skip_history)
         
\ No newline at end of file